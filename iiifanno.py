@@ -1,30 +1,319 @@
 #!/usr/bin/env python3
 
 import argparse
+import collections
+import http.client
+import io
 import json
 import logging
+import mmap
+import threading
+import concurrent.futures
+import functools
+import hashlib
+import tempfile
+import time
+import urllib.error
+import urllib.parse
 import urllib.request
 import sys
 import os.path
+from typing import Any, Callable, Iterable, Optional
+
+try:
+    import orjson
+except ImportError:
+    # fall back to stdlib json
+    orjson = None  # type: ignore
+
+try:
+    import simdjson  # type: ignore
+except ImportError:
+    # fall back to stdlib json for parsing
+    simdjson = None  # type: ignore
+
+try:
+    import ijson  # type: ignore
+except ImportError:
+    # no streaming parser
+    ijson = None  # type: ignore
+
+# fastest available JSON parser
+if orjson is not None:
+    json_loads = orjson.loads
+elif simdjson is not None:
+    json_loads = simdjson.loads
+else:
+    json_loads = json.loads
 
 VERSION = '1.0'
 
+HTTP_HEADERS = {
+    'User-Agent': 'iiifanno.py/' + VERSION,
+    'Accept': 'application/ld+json, application/json;q=0.9, */*;q=0.1'
+}
+HTTP_MAX_REDIRECTS = 5
+HTTP_MAX_WORKERS = 16
+# minimum size of local files to be memory-mapped for orjson
+MMAP_MIN_SIZE = 16 * 1024 * 1024
+
+# directory for cached external AnnotationPage/List files loaded via HTTP
+HTTP_CACHE_DIR = os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'), 'iiifanno')
+# maximum age of cache files in seconds, older files are loaded again
+HTTP_CACHE_MAX_AGE = 60 * 60
+
+# idle keep-alive HTTP connections by (scheme, host)
+http_pool: dict = dict()
+http_pool_lock = threading.Lock()
+# on-disk cache directory, None disables the cache
+http_cache_dir: Optional[str] = HTTP_CACHE_DIR
+
+
 def open_file_or_url(url):
     """
     open file or URL and return closeable fh
     """
     if url.startswith("http"):
         logging.info(f"  Loading resource from URL {url}")
-        return urllib.request.urlopen(url)
+        if urllib.request.getproxies():
+            # let urllib handle proxies
+            return urllib.request.urlopen(urllib.request.Request(url, headers=HTTP_HEADERS))
+
+        return open_http_url(url)
 
     else:
         logging.info(f"  Loading resource from file {url}")
-        return open(url, 'r')
+        if orjson is not None and os.path.getsize(url) >= MMAP_MIN_SIZE:
+            return MappedFile(url)
 
+        return open(url, 'rb')
 
-def save_json(data, filename, opts):
+
+class MappedFile:
     """
-    Save JSON data in file.
+    Closeable fh for a memory-mapped local file.
+    
+    read() without size returns a memoryview of the whole file without copying.
+    """
+    def __init__(self, filename):
+        self.name = filename
+        self.file = open(filename, 'rb')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = None
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            self.view = memoryview(self.map)
+            return self.view
+
+        return self.map.read(size)
+
+    def seek(self, pos):
+        return self.map.seek(pos)
+
+    def close(self):
+        if self.view is not None:
+            self.view.release()
+
+        self.map.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_http_url(url):
+    """
+    Load URL using pooled keep-alive connections and return content as closeable fh.
+    
+    Follows redirects, raises HTTPError on error status.
+    """
+    for _ in range(HTTP_MAX_REDIRECTS + 1):
+        response, body = http_get(url)
+        location = response.getheader('Location')
+        if response.status in (301, 302, 303, 307, 308) and location:
+            url = urllib.parse.urljoin(url, location)
+            logging.debug("  Redirected to %s", url)
+            continue
+
+        if response.status >= 400:
+            raise urllib.error.HTTPError(url, response.status, response.reason, response.headers, None)
+
+        return io.BytesIO(body)
+
+    raise urllib.error.HTTPError(url, response.status, "Too many redirects", response.headers, None)
+
+
+def http_get(url):
+    """
+    GET url using pooled connection and return (response, body)
+    """
+    parts = urllib.parse.urlsplit(url)
+    key = (parts.scheme, parts.netloc)
+    path = urllib.parse.urlunsplit(('', '', parts.path or '/', parts.query, ''))
+    conn, reused = get_http_connection(key)
+    try:
+        response, body = http_request(conn, path)
+
+    except ConnectionError:
+        if not reused:
+            raise
+
+        # server closed idle connection, retry once with new connection
+        logging.debug("  Reconnecting to %s", parts.netloc)
+        conn = create_http_connection(key)
+        response, body = http_request(conn, path)
+
+    if response.will_close:
+        conn.close()
+    else:
+        release_http_connection(key, conn)
+
+    return response, body
+
+
+def http_request(conn, path):
+    """
+    send GET request for path on conn and return (response, body)
+    """
+    try:
+        conn.request('GET', path, headers=HTTP_HEADERS)
+        response = conn.getresponse()
+        body = response.read()
+
+    except Exception:
+        conn.close()
+        raise
+
+    return response, body
+
+
+def create_http_connection(key):
+    """
+    return new HTTP(S)Connection for key (scheme, host)
+    """
+    scheme, netloc = key
+    if scheme == 'https':
+        return http.client.HTTPSConnection(netloc)
+
+    return http.client.HTTPConnection(netloc)
+
+
+def get_http_connection(key):
+    """
+    return (connection, reused) with idle connection for key (scheme, host) from pool or new connection
+    """
+    with http_pool_lock:
+        idle = http_pool.get(key)
+        if idle:
+            return idle.pop(), True
+
+    return create_http_connection(key), False
+
+
+def release_http_connection(key, conn):
+    """
+    return idle connection for key (scheme, host) to pool
+    """
+    with http_pool_lock:
+        http_pool.setdefault(key, []).append(conn)
+
+
+def load_json(file, url):
+    """
+    Read and parse JSON data from fh loaded from url.
+    """
+    return parse_json(file.read(), url)
+
+
+def parse_json(data, url):
+    """
+    Parse JSON data loaded from url.
+    
+    Uses orjson or simdjson if available.
+    """
+    try:
+        return json_loads(data)
+
+    except ValueError as e:
+        raise ValueError(f"Invalid JSON in {url}: {e}") from e
+
+
+@functools.lru_cache(maxsize=256)
+def fetch_json(url):
+    """
+    Load and parse JSON from file or URL.
+    
+    Results are cached, repeated urls are loaded only once.
+    URLs are also cached on disk in http_cache_dir.
+    """
+    if http_cache_dir and url.startswith("http"):
+        return fetch_json_cached(url, http_cache_dir)
+
+    with open_file_or_url(url) as file:
+        return load_json(file, url)
+
+
+def fetch_json_cached(url, cache_dir):
+    """
+    Load and parse JSON from URL using the on-disk cache in cache_dir.
+    
+    Cache files are named by the SHA-256 hash of the URL.
+    Files older than HTTP_CACHE_MAX_AGE are loaded again.
+    """
+    fn = os.path.join(cache_dir, hashlib.sha256(url.encode('utf-8')).hexdigest() + '.json')
+    if os.path.isfile(fn) and time.time() - os.path.getmtime(fn) < HTTP_CACHE_MAX_AGE:
+        logging.info(f"  Loading resource {url} from cache file {fn}")
+        with open(fn, 'rb') as file:
+            return load_json(file, fn)
+
+    with open_file_or_url(url) as file:
+        payload = file.read()
+
+    # parse before caching to keep invalid responses out of the cache
+    data = parse_json(payload, url)
+    tmp_fn = None
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, tmp_fn = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as file:
+            file.write(payload)
+
+        # replace atomically for concurrent runs
+        os.replace(tmp_fn, fn)
+
+    except OSError as e:
+        logging.warning(f"Unable to write cache file for {url}: {e}")
+        if tmp_fn is not None and os.path.exists(tmp_fn):
+            try:
+                os.unlink(tmp_fn)
+            except OSError:
+                pass
+
+    return data
+
+
+def fetch_json_parallel(urls):
+    """
+    Load and parse JSON from list of files or URLs concurrently.
+    
+    Returns dict of parsed JSON by url.
+    """
+    urls = list(dict.fromkeys(urls))
+    if len(urls) < 2:
+        return {url: fetch_json(url) for url in urls}
+
+    workers = min(HTTP_MAX_WORKERS, len(urls))
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        return dict(zip(urls, executor.map(fetch_json, urls)))
+
+
+def get_output_filename(filename, opts):
+    """
+    Return path of output file filename in output_directory.
     """
     fn = filename
     dir = opts.get('output_directory', None)
@@ -34,19 +323,72 @@ def save_json(data, filename, opts):
     logging.info(f"  Writing file {fn}")
     if os.path.isfile(fn):
         logging.warning(f"File {fn} will be overwritten.")
-        
-    with open(fn, 'w') as file:
-        json.dump(data, file)
 
+    return fn
+
+
+def dump_json(data):
+    """
+    Serialize data as compact JSON bytes.
+    """
+    if orjson is not None:
+        return orjson.dumps(data)
+
+    return json.dumps(data).encode('utf-8')
+
+
+def save_json(data, filename, opts):
+    """
+    Save JSON data in file.
+    """
+    fn = get_output_filename(filename, opts)
+    # serialize to one buffer and write it in one go
+    if orjson is not None:
+        payload = orjson.dumps(data, option=orjson.OPT_APPEND_NEWLINE)
+    else:
+        payload = (json.dumps(data) + '\n').encode('utf-8')
+
+    with open(fn, 'wb') as file:
+        file.write(payload)
+
+
+def save_json_items(data, items_key, filename, opts):
+    """
+    Save JSON data in file writing the list in data[items_key] item by item.
+    
+    items_key has to be the last key in data.
+    Only one item is serialized at a time instead of the whole document.
+    """
+    if list(data)[-1] != items_key:
+        raise ValueError(f"{items_key} is not the last key")
+
+    fn = get_output_filename(filename, opts)
+    # serialize data with empty list and split it around the list
+    header = dump_json(dict(data, **{items_key: []}))
+    prefix = header[:-2]
+    suffix = header[-1:] + b'\n'
+    sep = b',' if orjson is not None else b', '
+    with open(fn, 'wb') as file:
+        write = file.write
+        write(prefix)
+        for idx, item in enumerate(data[items_key]):
+            if idx:
+                write(sep)
+                
+            write(dump_json(item))
+            
+        write(b']' + suffix)
 
-def get_string(val):
+
+def get_string(val: Any) -> Any:
     """
     returns val as string.
     
     returns value[0] if it is a list of one element, 
     returns repr(value) otherwise.
     """
-    if isinstance(val, str):
+    if type(val) is str:
+        # common case
         return val
     elif isinstance(val, list) and len(val) == 1:
         return val[0]
@@ -54,51 +396,42 @@ def get_string(val):
         return repr(val)
 
 
-def put_add(item, key, val, single_item_list=True):
+def create_annotation_info() -> dict:
     """
-    puts val in dict item at key, adds val to list if item already has value
+    Return empty annotation_info structure.
+    
+    Holds the list of annotations, lists of annotations by target URI and the set of motivations.
     """
-    oldval = item.get(key, None)
-    if oldval is None:
-        if single_item_list:
-            item[key] = [val]
-        else:
-            item[key] = val
-    elif isinstance(oldval, list):
-        oldval.append(val)
-    else:
-        item[key] = [oldval, val]
+    return {
+        'annotations': [],
+        'by_target': collections.defaultdict(list),
+        'motivations': set()
+    }
 
 
-def parse_annotation(anno):
+def read_annotation_v2(anno: dict) -> tuple:
     """
-    parse V2 or V3 annotation
+    Read anno as IIIF V2 annotation and return (id, target, motivation)
     """
-    if anno.get('type', None) == 'Annotation':
-        return parse_annotation_v3(anno)
-    
-    elif anno.get('@type', None) == 'oa:Annotation':
-        return parse_annotation_v2(anno)
-    
-    raise ValueError("Annotation type not found!")
+    if anno.get('@type') != 'oa:Annotation':
+        raise ValueError("Annotation type not found!")
 
+    try:
+        anno_id = anno['@id']
+        anno_target = anno['on']
+    except KeyError:
+        anno_id = anno.get('@id')
+        anno_target = None
 
-def parse_annotation_v2(anno):
-    """
-    Parse anno as IIIF V2 annotation
-    """
-    anno_id = anno.get('@id', None)
-    logging.debug(f"Annotation id: {anno_id}")
     if  not anno_id:
         raise ValueError("Annotation has no id")
 
-    anno_target = anno.get('on', None)
     if  not anno_target:
         raise ValueError(f"Annotation {anno_id} has no target")
     
-    if isinstance(anno_target, str):
-        # target is URI, split off fragment selector
-        target_uri, _, frag = anno_target.partition('#')
+    if type(anno_target) is str:
+        # target is URI (common case), split off fragment selector
+        target_uri = anno_target.partition('#')[0]
         
     elif isinstance(anno_target, dict):
         if 'id' in anno_target:
@@ -113,39 +446,45 @@ def parse_annotation_v2(anno):
     else:
         raise ValueError(f"Annotation {anno_id} target is not str or dict")
     
-    logging.debug(f"Annotation target URI: {target_uri}")
+    # intern repeated target URIs and motivations
+    if type(target_uri) is str:
+        target_uri = sys.intern(target_uri)
     
-    if 'motivation' in anno:
-        motivation = get_string(anno.get('motivation', None))
-    else:
-        motivation = None
-
-    annotation_info = {
-        'version': 2,
-        'id': anno_id,
-        'target': target_uri,
-        'motivation': motivation,
-        'annotation': anno
-    }
-    return annotation_info
+    motivation = anno.get('motivation')
+    if type(motivation) is str:
+        # common case, skip get_string
+        motivation = sys.intern(motivation)
+    elif motivation is not None:
+        motivation = get_string(motivation)
+        if isinstance(motivation, str):
+            motivation = sys.intern(motivation)
 
+    return anno_id, target_uri, motivation
 
-def parse_annotation_v3(anno):
+
+def read_annotation_v3(anno: dict) -> tuple:
     """
-    Parse anno as IIIF V3 annotation
+    Read anno as IIIF V3 annotation and return (id, target, motivation)
     """
-    anno_id = anno.get('id', None)
-    logging.debug(f"Annotation id: {anno_id}")
+    if anno.get('type') != 'Annotation':
+        raise ValueError("Annotation type not found!")
+
+    try:
+        anno_id = anno['id']
+        anno_target = anno['target']
+    except KeyError:
+        anno_id = anno.get('id')
+        anno_target = None
+
     if  not anno_id:
         raise ValueError("Annotation has no id")
 
-    anno_target = anno.get('target', None)
     if  not anno_target:
         raise ValueError(f"Annotation {anno_id} has no target")
     
-    if isinstance(anno_target, str):
-        # target is URI, split off fragment selector
-        target_uri, _, frag = anno_target.partition('#')
+    if type(anno_target) is str:
+        # target is URI (common case), split off fragment selector
+        target_uri = anno_target.partition('#')[0]
         
     elif isinstance(anno_target, dict):
         if 'id' in anno_target:
@@ -160,115 +499,221 @@ def parse_annotation_v3(anno):
     else:
         raise ValueError(f"Annotation {anno_id} target is not str or dict")
     
-    logging.debug(f"Annotation target URI: {target_uri}")
+    # intern repeated target URIs and motivations
+    if type(target_uri) is str:
+        target_uri = sys.intern(target_uri)
     
-    if 'motivation' in anno:
-        motivation = get_string(anno.get('motivation', None))
-    else:
-        motivation = None
-
-    annotation_info = {
-        'version': 3,
-        'id': anno_id,
-        'target': target_uri,
-        'motivation': motivation,
-        'annotation': anno
-    }
-    return annotation_info
+    motivation = anno.get('motivation')
+    if type(motivation) is str:
+        # common case, skip get_string
+        motivation = sys.intern(motivation)
+    elif motivation is not None:
+        motivation = get_string(motivation)
+        if isinstance(motivation, str):
+            motivation = sys.intern(motivation)
+
+    return anno_id, target_uri, motivation
 
 
-def parse_annotationlist_v2(annolist, annotation_info):
+def parse_annotationlist_v2(annolist: dict, annotation_info: Optional[dict],
+                            prefetched: Optional[dict] = None) -> dict:
     """
     Parse annolist as V2 sc:AnnotationList for annotations.
     
     Stores results in annotation_info.
-    Loads external annotationlists via HTTP.
+    Loads external annotationlists via HTTP unless they are in prefetched.
     """
     if annotation_info is None:
-        annotation_info = {
-            'annotations': [],
-            'by_target': dict(),
-            'motivations': set()
-        }
+        annotation_info = create_annotation_info()
         
-    annotations = annotation_info['annotations']
-    targets = annotation_info['by_target']
-    motivations = annotation_info['motivations']
     
-    annolist_id = annolist.get('@id', None)
-    logging.debug(f"AnnotationList id: {annolist_id}")
+    get = annolist.get
+    annolist_id = get('@id')
+    logging.debug("AnnotationList id: %s", annolist_id)
     if not annolist_id:
         raise ValueError("AnnotationList has no id")
     
-    if annolist.get('@type', None) != 'sc:AnnotationList':
+    if get('@type') != 'sc:AnnotationList':
         raise ValueError(f"AnnotationList {annolist_id} not of type sc:AnnotationList")
 
     if not 'resources' in annolist:
         # external AnnotationList
-        with open_file_or_url(annolist_id) as file:
-            ext_annolist = json.load(file)
-            return parse_annotationlist_v2(ext_annolist, annotation_info)
+        if prefetched and annolist_id in prefetched:
+            ext_annolist = prefetched[annolist_id]
+        else:
+            ext_annolist = fetch_json(annolist_id)
+
+        return parse_annotationlist_v2(ext_annolist, annotation_info)
         
-    annolist_items = annolist.get('resources', None)
+    annolist_items = get('resources')
     if  annolist_items is None or not isinstance(annolist_items, list):
         raise ValueError(f"AnnotationList has no resources!")
     
-    for anno in annolist_items:
-        anno_info = parse_annotation(anno)
-        annotations.append(anno_info)
-        put_add(targets, anno_info['target'], anno_info)
-        motivations.add(anno_info['motivation'])
-
+    add_annotations(annolist_items, read_annotation_v2, annotation_info)
     return annotation_info
 
 
-def parse_annotationlist_v3(annolist, annotation_info):
+def parse_annotationlist_v3(annolist: dict, annotation_info: Optional[dict],
+                            prefetched: Optional[dict] = None) -> dict:
     """
     Parse annolist as V3 AnnotationPage for annotations.
     
-    loads external annotationpage via HTTP.
+    loads external annotationpage via HTTP unless it is in prefetched.
     """
     if annotation_info is None:
-        annotation_info = {
-            'annotations': [],
-            'by_target': dict(),
-            'motivations': set()
-        }
+        annotation_info = create_annotation_info()
         
-    annotations = annotation_info['annotations']
-    targets = annotation_info['by_target']
-    motivations = annotation_info['motivations']
 
-    annolist_id = annolist.get('id', None)
-    logging.debug(f"AnnotationPage id: {annolist_id}")
+    get = annolist.get
+    annolist_id = get('id')
+    logging.debug("AnnotationPage id: %s", annolist_id)
     if  not annolist_id:
         raise ValueError("AnnotationPage has no id")
     
-    if annolist.get('type', None) != 'AnnotationPage':
+    if get('type') != 'AnnotationPage':
         raise ValueError(f"AnnotationPage {annolist_id} not of type AnnotationPage")
 
     if not 'items' in annolist:
         # external AnnotationPage
-        with open_file_or_url(annolist_id) as file:
-            ext_annolist = json.load(file)
-            return parse_annotationlist_v3(ext_annolist, annotation_info)
+        if prefetched and annolist_id in prefetched:
+            ext_annolist = prefetched[annolist_id]
+        else:
+            ext_annolist = fetch_json(annolist_id)
 
-    annolist_items = annolist.get('items', None)
+        return parse_annotationlist_v3(ext_annolist, annotation_info)
+
+    annolist_items = get('items')
     if  annolist_items is None or not isinstance(annolist_items, list):
         raise ValueError(f"AnnotationPage has no items!")
 
-    for anno in annolist_items:
-        anno_info = parse_annotation(anno)
-        annotations.append(anno_info)
-        put_add(targets, anno_info['target'], anno_info)
-        motivations.add(anno_info['motivation'])
-
+    add_annotations(annolist_items, read_annotation_v3, annotation_info)
     return annotation_info
 
 
-def create_annotationlist_v2(manifest_info, annolist_id, annotation_infos, add_context=False):
+def add_annotations(annos: Iterable[dict], read_anno: Callable[[dict], tuple], annotation_info: dict) -> None:
     """
-    Return V2 AnnotationList structure from annotation_infos
+    Read annotations from list or iterator annos using read_anno and add to annotation_info.
+    """
+    # bind methods used in the loop
+    annotations_append = annotation_info['annotations'].append
+    targets = annotation_info['by_target']
+    motivations_add = annotation_info['motivations'].add
+    # check log level once instead of per annotation
+    debug = logging.getLogger().isEnabledFor(logging.DEBUG)
+
+    # sentinel, None is a valid motivation
+    last_motivation = object()
+    for anno in annos:
+        anno_id, target_uri, motivation = read_anno(anno)
+        if debug:
+            logging.debug("Annotation id: %s target URI: %s", anno_id, target_uri)
+
+        annotations_append(anno)
+        targets[target_uri].append(anno)
+        # motivations are interned and usually repeat
+        if motivation is not last_motivation:
+            motivations_add(motivation)
+            last_motivation = motivation
+
+
+def stream_annotationlist(file, version):
+    """
+    Parse V2 AnnotationList or V3 AnnotationPage from binary fh incrementally using ijson.
+    
+    Returns annotation_info.
+    """
+    if version == 2:
+        items_key = 'resources'
+        parse_annolist, read_anno = parse_annotationlist_v2, read_annotation_v2
+    else:
+        items_key = 'items'
+        parse_annolist, read_anno = parse_annotationlist_v3, read_annotation_v3
+
+    header = dict()
+    annotation_info = create_annotation_info()
+    add_annotations(iter_json_items(file, items_key, header), read_anno, annotation_info)
+    # validate header (or load external list)
+    return parse_annolist(header, annotation_info)
+
+
+def iter_json_items(file, items_path, header, item_counts=None):
+    """
+    Iterate over the items of the list at items_path in JSON from binary fh using ijson.
+    
+    items_path is a top-level key or a dotted ijson prefix like 'sequences.item.canvases'.
+    The top-level values without the items are stored in header when the iteration is finished,
+    the list at items_path is empty in header if it exists.
+    The number of items of each list at items_path is appended to item_counts.
+    """
+    builders = dict()
+    item_prefix = items_path + '.item'
+    item_prefix_dot = item_prefix + '.'
+    if item_counts is None:
+        item_counts = []
+
+    def record_header(events):
+        for prefix, event, value in events:
+            if prefix == item_prefix:
+                # count item starts, not the keys and ends inside items
+                if event not in ('map_key', 'end_map', 'end_array'):
+                    item_counts[-1] += 1
+
+            elif not prefix.startswith(item_prefix_dot):
+                if prefix == items_path and event == 'start_array':
+                    item_counts.append(0)
+
+                key = prefix.partition('.')[0]
+                if key:
+                    if key not in builders:
+                        builders[key] = ijson.ObjectBuilder()
+
+                    builders[key].event(event, value)
+
+            yield prefix, event, value
+
+    events = record_header(ijson.parse(file, use_float=True))
+    try:
+        yield from ijson.items(events, item_prefix)
+
+    except ijson.JSONError as e:
+        # report like JSON errors of the other parsers
+        raise ValueError(f"Invalid JSON in {file.name}: {e}") from e
+
+    for key, builder in builders.items():
+        header[key] = builder.value
+
+
+def peek_json_context(file):
+    """
+    Return top-level @context string of JSON in binary fh using ijson and rewind fh.
+    """
+    context = None
+    try:
+        for prefix, event, value in ijson.parse(file):
+            if prefix == '@context':
+                if event == 'string':
+                    context = value
+
+                break
+
+    except ijson.JSONError as e:
+        raise ValueError(f"Invalid JSON in {file.name}: {e}") from e
+
+    file.seek(0)
+    return context
+
+
+def can_stream_file(url):
+    """
+    Return if url is a local file that can be parsed incrementally.
+    """
+    return ijson is not None and os.path.isfile(url)
+
+
+def create_annotationlist_v2(manifest_info: dict, annolist_id: str, annotations: Iterable[dict],
+                             add_context: bool = False) -> dict:
+    """
+    Return V2 AnnotationList structure from annotations
     """
     annolist = {
         '@type': 'sc:AnnotationList',
@@ -278,13 +723,14 @@ def create_annotationlist_v2(manifest_info, annolist_id, annotation_infos, add_c
     if add_context:
         annolist['@context'] = 'http://iiif.io/api/presentation/2/context.json'
         
-    annolist['resources'] = [ai['annotation'] for ai in annotation_infos]
+    annolist['resources'] = list(annotations)
     return annolist
 
 
-def create_annotationlist_v3(manifest_info, annolist_id, annotation_infos, add_context=False):
+def create_annotationlist_v3(manifest_info: dict, annolist_id: str, annotations: Iterable[dict],
+                             add_context: bool = False) -> dict:
     """
-    Return V3 AnnotationPage structure from annotation_infos
+    Return V3 AnnotationPage structure from annotations
     """
     annolist = {
         'type': 'AnnotationPage',
@@ -294,20 +740,16 @@ def create_annotationlist_v3(manifest_info, annolist_id, annotation_infos, add_c
     if add_context:
         annolist['@context'] = 'http://iiif.io/api/presentation/3/context.json'
 
-    annolist['items'] = [ai['annotation'] for ai in annotation_infos]
+    annolist['items'] = list(annotations)
     return annolist
 
 
-def parse_manifest(manif, manifest_info, opts):
+def parse_manifest(manif: dict, manifest_info: Optional[dict]) -> dict:
     """
     parse V2 or V3 manifest for annotations
     """
     if manifest_info is None:
-        annotation_info = {
-            'annotations': [],
-            'by_target': dict(),
-            'motivations': set()
-        }
+        annotation_info = create_annotation_info()
         manifest_info = {
             'annotations': annotation_info,
             'manifest': manif
@@ -315,214 +757,400 @@ def parse_manifest(manif, manifest_info, opts):
     
     ctx = manif.get('@context', None)
     if ctx == 'http://iiif.io/api/presentation/3/context.json':
-        return parse_manifest_v3(manif, manifest_info, opts)
+        return parse_manifest_v3(manif, manifest_info)
     
     elif ctx == 'http://iiif.io/api/presentation/2/context.json':
-        return parse_manifest_v2(manif, manifest_info, opts)
+        return parse_manifest_v2(manif, manifest_info)
     
     raise ValueError("No applicable JSON-LD context found! Manifest is not IIIF V2 or V3 manifest!")
 
 
-def parse_manifest_v2(manif, manifest_info, opts):
+def parse_manifest_v2(manif: dict, manifest_info: dict) -> dict:
     """
     Parse IIIF V2 manifest for annotations.
     
-    Reads into manifest_info if opts['mode'] == 'read'.
-    Inserts annotations from manifest_info into manif if  opts['mode'] == 'insert'.
+    Reads into manifest_info.
     """
     annotation_info = manifest_info['annotations']
     canvas_ids = set()
-    annolist_idx = 0
+    canvas_refs = []
+    canvas_annolists = []
     
-    if manif.get('@type', None) != 'sc:Manifest':
+    manif_id, manif_label, manif_sequences = read_manifest_v2(manif)
+    for sequence in manif_sequences:
+        if sequence.get('@type') != 'sc:Sequence':
+            raise ValueError(f"Sequence not of type sc:Sequence")
+        
+        canvases = sequence.get('canvases')
+        if not canvases or not isinstance(canvases, list) or len(canvases) < 1:
+            raise ValueError("Sequence has no canvases")
+
+        for canvas in canvases:
+            canvas_id, canvas_annos = read_canvas_v2(canvas)
+            # record canvas and annotations
+            canvas_ids.add(canvas_id)
+            canvas_refs.append(canvas)
+            if canvas_annos:
+                canvas_annolists.extend(canvas_annos)
+            
+    parse_annotationlists_v2(canvas_annolists, annotation_info)
+    manifest_info['manifest_version'] = 2
+    manifest_info['id'] = manif_id
+    manifest_info['label'] = manif_label
+    manifest_info['canvas_ids'] = canvas_ids
+    manifest_info['canvases'] = canvas_refs
+    return manifest_info
+
+
+def read_manifest_v2(manif: dict) -> tuple:
+    """
+    Validate IIIF V2 manifest and return (manifest_id, label, sequences)
+    """
+    get = manif.get
+    if get('@type') != 'sc:Manifest':
         raise ValueError("Manifest not of type Manifest")
     
-    manif_id = manif.get('@id', None)
-    logging.debug(f"manifest id: {manif_id}")
+    manif_id = get('@id')
+    logging.debug("manifest id: %s", manif_id)
     if  not manif_id:
         raise ValueError("Manifest has no id")
     
-    manif_label = manif.get('label', None)
-    logging.debug(f"manifest label: {manif_label}")
+    manif_label = get('label')
+    logging.debug("manifest label: %s", manif_label)
     if  not manif_label:
         raise ValueError("Manifest has no label")
     
-    manif_sequences = manif.get('sequences', None)
+    manif_sequences = get('sequences')
     if  manif_sequences is None or not isinstance(manif_sequences, list) or len(manif_sequences) < 1:
         raise ValueError("Manifest has no sequences")
     
-    logging.debug(f"manifest has {len(manif_sequences)} sequences.")
+    logging.debug("manifest has %s sequences.", len(manif_sequences))
+    return manif_id, manif_label, manif_sequences
 
-    for sequence in manif_sequences:
-        if sequence.get('@type', None) != 'sc:Sequence':
-            raise ValueError(f"Sequence not of type sc:Sequence")
-        
-        canvases = sequence.get('canvases', None)
-        if not canvases or not isinstance(canvases, list) or len(canvases) < 1:
-            raise ValueError("Sequence has no canvases")
 
-        for canvas in canvases:
-            canvas_id = canvas.get('@id', None)
-            logging.debug(f"canvas id: {canvas_id}")
-            if  not canvas_id:
-                raise ValueError("Canvas has no id")
-            
-            if canvas.get('@type', None) != 'sc:Canvas':
-                raise ValueError(f"Canvas {canvas_id} not of type sc:Canvas")
-        
-            canvas_label = canvas.get('label', None)
-            logging.debug(f"canvas label: {canvas_label}")
-            if  not canvas_label:
-                raise ValueError(f"Canvas {canvas_id} has no label")
-            
-            canvas_images = canvas.get('images', None)
-            if  canvas_images is None or not isinstance(canvas_images, list):
-                raise ValueError(f"Canvas {canvas_id} has no images")
-
-            canvas_annos = canvas.get('otherContent', None)
-            if opts['mode'] == 'read':
-                #
-                # read mode: record canvas id and annotations
-                #
-                canvas_ids.add(canvas_id)
-                if  canvas_annos is None or not isinstance(canvas_annos, list):
-                    # no annotationpages
-                    continue
-
-                for annolist in canvas_annos:
-                    parse_annotationlist_v2(annolist, annotation_info)
-                    
-            elif opts['mode'] == 'insert':
-                #
-                # insert mode
-                #
-                annotations = annotation_info['by_target'].get(canvas_id, None)
-                if annotations is None:
-                    continue
-                
-                annolist_idx += 1
-                annolist_id, annolist_fn = create_annotationlist_id(manifest_info, canvas_id, annolist_idx, opts)
-                if opts['reference_mode'] == 'inline':
-                    logging.warning("Inline AnnotationLists are not allowed in the IIIF V2 presentation API!")
-                    annolist = create_annotationlist_v2(manifest_info, annolist_id, annotations, add_context=False)
-                    canvas['otherContent'] = [annolist]
-                    
-                else:
-                    annolist = create_annotationlist_v2(manifest_info, annolist_id, annotations, add_context=True)
-                    save_json(annolist, annolist_fn, opts)
-                    canvas['otherContent'] = [{
-                        '@id': annolist_id,
-                        '@type': 'sc:AnnotationList'
-                    }]
-            
-    if opts['mode'] == 'read':
-        manifest_info['manifest_version'] = 2
-        manifest_info['id'] = manif_id
-        manifest_info['label'] = manif_label
-        manifest_info['canvas_ids'] = canvas_ids
-        
-    elif opts['mode'] == 'insert':
-        manif['@id'] = manifest_info['id']
-        manifest_info['manifest'] = manif
+def read_canvas_v2(canvas: dict) -> tuple:
+    """
+    Validate IIIF V2 canvas and return (canvas_id, annotationlists)
+    """
+    get = canvas.get
+    canvas_id = get('@id')
+    logging.debug("canvas id: %s", canvas_id)
+    if  not canvas_id:
+        raise ValueError("Canvas has no id")
+    
+    if get('@type') != 'sc:Canvas':
+        raise ValueError(f"Canvas {canvas_id} not of type sc:Canvas")
 
-    return manifest_info
+    canvas_label = get('label')
+    logging.debug("canvas label: %s", canvas_label)
+    if  not canvas_label:
+        raise ValueError(f"Canvas {canvas_id} has no label")
+    
+    canvas_images = get('images')
+    if  canvas_images is None or not isinstance(canvas_images, list):
+        raise ValueError(f"Canvas {canvas_id} has no images")
+
+    canvas_annos = get('otherContent')
+    if  canvas_annos is None or not isinstance(canvas_annos, list):
+        # no annotationlists
+        canvas_annos = None
+
+    if type(canvas_id) is str:
+        canvas_id = sys.intern(canvas_id)
+
+    return canvas_id, canvas_annos
 
 
-def parse_manifest_v3(manif, manifest_info, opts):
+def parse_manifest_v3(manif: dict, manifest_info: dict) -> dict:
     """
     parse IIIF V3 manifest for annotations
     """
     annotation_info = manifest_info['annotations']
     canvas_ids = set()
-    annolist_idx = 0
+    canvas_refs = []
+    canvas_annolists = []
     
-    if manif.get('type', None) != 'Manifest':
+    get = manif.get
+    if get('type') != 'Manifest':
         raise ValueError("Manifest not of type Manifest")
     
-    manif_id = manif.get('id', None)
-    logging.debug(f"manifest id: {manif_id}")
+    manif_id = get('id')
+    logging.debug("manifest id: %s", manif_id)
     if  not manif_id:
         raise ValueError("Manifest has no id")
     
-    manif_label = manif.get('label', None)
-    logging.debug(f"manifest label: {manif_label}")
+    manif_label = get('label')
+    logging.debug("manifest label: %s", manif_label)
     if  not manif_label:
         raise ValueError("Manifest has no label")
     
-    manif_items = manif.get('items', None)
+    manif_items = get('items')
     if  manif_items is None or not isinstance(manif_items, list):
         raise ValueError("Manifest has no items")
     
-    logging.debug(f"manifest has {len(manif_items)} items")
+    logging.debug("manifest has %s items", len(manif_items))
 
     for canvas in manif_items:
-        canvas_id = canvas.get('id', None)
-        logging.debug(f"canvas id: {canvas_id}")
-        if  not canvas_id:
-            raise ValueError("Canvas has no id")
-        
-        if canvas.get('type', None) != 'Canvas':
-            raise ValueError(f"Canvas {canvas_id} not of type Canvas")
+        canvas_id, canvas_annos = read_canvas_v3(canvas)
+        # record canvas and annotations
+        canvas_ids.add(canvas_id)
+        canvas_refs.append(canvas)
+        if canvas_annos:
+            canvas_annolists.extend(canvas_annos)
+
+    parse_annotationlists_v3(canvas_annolists, annotation_info)
+    manifest_info = {
+        'manifest_version': 3,
+        'id': manif_id,
+        'label': manif_label,
+        'canvas_ids': canvas_ids,
+        'canvases': canvas_refs,
+        'annotations': annotation_info,
+        'manifest': manif
+    }
+    return manifest_info
+
+
+def parse_annotationlists_v2(annolists: list, annotation_info: dict) -> None:
+    """
+    Parse list of V2 AnnotationLists into annotation_info.
     
-        canvas_label = canvas.get('label', None)
-        logging.debug(f"canvas label: {canvas_label}")
-        if  not canvas_label:
-            raise ValueError(f"Canvas {canvas_id} has no label")
-        
-        canvas_items = canvas.get('items', None)
-        if  canvas_items is None or not isinstance(canvas_items, list):
-            raise ValueError(f"Canvas {canvas_id} has no items")
+    Loads external AnnotationLists concurrently.
+    """
+    # prefetch only valid references that parse_annotationlist_v2 would load
+    prefetched = fetch_json_parallel(al.get('@id') for al in annolists
+                                     if isinstance(al, dict) and 'resources' not in al and al.get('@id')
+                                     and al.get('@type') == 'sc:AnnotationList')
+    for annolist in annolists:
+        parse_annotationlist_v2(annolist, annotation_info, prefetched)
+
+
+def read_canvas_v3(canvas: dict) -> tuple:
+    """
+    Validate IIIF V3 canvas and return (canvas_id, annotationpages)
+    """
+    get = canvas.get
+    canvas_id = get('id')
+    logging.debug("canvas id: %s", canvas_id)
+    if  not canvas_id:
+        raise ValueError("Canvas has no id")
+    
+    if get('type') != 'Canvas':
+        raise ValueError(f"Canvas {canvas_id} not of type Canvas")
+
+    canvas_label = get('label')
+    logging.debug("canvas label: %s", canvas_label)
+    if  not canvas_label:
+        raise ValueError(f"Canvas {canvas_id} has no label")
+    
+    canvas_items = get('items')
+    if  canvas_items is None or not isinstance(canvas_items, list):
+        raise ValueError(f"Canvas {canvas_id} has no items")
+
+    canvas_annos = get('annotations')
+    if  canvas_annos is None or not isinstance(canvas_annos, list):
+        # no annotationpages
+        canvas_annos = None
+
+    if type(canvas_id) is str:
+        canvas_id = sys.intern(canvas_id)
+
+    return canvas_id, canvas_annos
+
+
+def parse_annotationlists_v3(annolists: list, annotation_info: dict) -> None:
+    """
+    Parse list of V3 AnnotationPages into annotation_info.
+    
+    Loads external AnnotationPages concurrently.
+    """
+    # prefetch only valid references that parse_annotationlist_v3 would load
+    prefetched = fetch_json_parallel(al.get('id') for al in annolists
+                                     if isinstance(al, dict) and 'items' not in al and al.get('id')
+                                     and al.get('type') == 'AnnotationPage')
+    for annolist in annolists:
+        parse_annotationlist_v3(annolist, annotation_info, prefetched)
+
+
+def stream_manifest_v3(file):
+    """
+    Parse IIIF V3 manifest from binary fh incrementally using ijson.
     
+    Keeps only the annotations, manifest_info has no manifest and canvases.
+    """
+    header = dict()
+    canvas_ids = set()
+    canvas_annolists = []
+    for canvas in iter_json_items(file, 'items', header):
+        canvas_id, canvas_annos = read_canvas_v3(canvas)
         canvas_ids.add(canvas_id)
-        canvas_annos = canvas.get('annotations', None)
-        if opts['mode'] == 'read':
-            #
-            # read mode: record canvas id and annotations
-            #
-            canvas_ids.add(canvas_id)
-            if  canvas_annos is None or not isinstance(canvas_annos, list):
-                # no annotationpages
-                continue
+        if canvas_annos:
+            canvas_annolists.extend(canvas_annos)
+
+    # validate manifest without canvases
+    manifest_info = parse_manifest(header, None)
+    parse_annotationlists_v3(canvas_annolists, manifest_info['annotations'])
+    manifest_info['canvas_ids'] = canvas_ids
+    del manifest_info['canvases']
+    del manifest_info['manifest']
+    return manifest_info
 
-            for annolist in canvas_annos:
-                parse_annotationlist_v3(annolist, annotation_info)
-                
-        elif opts['mode'] == 'insert':
-            #
-            # insert mode
-            #
-            annotations = annotation_info['by_target'].get(canvas_id, None)
-            if annotations is None:
-                continue
-            
-            annolist_idx += 1
-            annolist_id, annolist_fn = create_annotationlist_id(manifest_info, canvas_id, annolist_idx, opts)
-            if opts['reference_mode'] == 'inline':
-                annolist = create_annotationlist_v3(manifest_info, annolist_id, annotations, add_context=False)
-                canvas['annotations'] = [annolist]
-                
-            else:
-                annolist = create_annotationlist_v3(manifest_info, annolist_id, annotations, add_context=True)
-                save_json(annolist, annolist_fn, opts)
-                canvas['annotations'] = [{
-                    'id': annolist_id,
-                    'type': 'AnnotationPage'
-                }]
-
-    if opts['mode'] == 'read':
-        manifest_info = {
-            'manifest_version': 3,
-            'id': manif_id,
-            'label': manif_label,
-            'canvas_ids': canvas_ids,
-            'annotations': annotation_info,
-            'manifest': manif
-        }
+
+def stream_manifest_v2(file):
+    """
+    Parse IIIF V2 manifest from binary fh incrementally using ijson.
+    
+    Keeps only the annotations, manifest_info has no manifest and canvases.
+    """
+    header = dict()
+    canvas_ids = set()
+    canvas_annolists = []
+    canvas_counts = []
+    for canvas in iter_json_items(file, 'sequences.item.canvases', header, canvas_counts):
+        canvas_id, canvas_annos = read_canvas_v2(canvas)
+        canvas_ids.add(canvas_id)
+        if canvas_annos:
+            canvas_annolists.extend(canvas_annos)
+
+    # validate manifest and sequences without canvases
+    manif_id, manif_label, manif_sequences = read_manifest_v2(header)
+    for idx, sequence in enumerate(manif_sequences):
+        if sequence.get('@type') != 'sc:Sequence':
+            raise ValueError("Sequence not of type sc:Sequence")
         
-    elif opts['mode'] == 'insert':
-        manif['id'] = manifest_info['id']
-        manifest_info['manifest'] = manif
+        # each previous sequence has a canvases list with an entry in canvas_counts
+        if not isinstance(sequence.get('canvases'), list) or canvas_counts[idx] < 1:
+            raise ValueError("Sequence has no canvases")
+
+    annotation_info = create_annotation_info()
+    parse_annotationlists_v2(canvas_annolists, annotation_info)
+    manifest_info = {
+        'manifest_version': 2,
+        'id': manif_id,
+        'label': manif_label,
+        'canvas_ids': canvas_ids,
+        'annotations': annotation_info
+    }
+    return manifest_info
+
+
+def read_manifest(url, stream=False):
+    """
+    Load and parse V2 or V3 manifest from file or URL and return manifest_info.
+    
+    Parses local manifests incrementally with ijson if stream.
+    Streaming uses less memory but is several times slower than loading the whole file.
+    """
+    with open_file_or_url(url) as file:
+        if stream and can_stream_file(url):
+            ctx = peek_json_context(file)
+            if ctx == 'http://iiif.io/api/presentation/3/context.json':
+                logging.debug("Parsing manifest incrementally")
+                return stream_manifest_v3(file)
+
+            elif ctx == 'http://iiif.io/api/presentation/2/context.json':
+                logging.debug("Parsing manifest incrementally")
+                return stream_manifest_v2(file)
+
+        manif = load_json(file, url)
+        return parse_manifest(manif, None)
+
+
+def insert_annotations(manifest_info: dict, opts: dict) -> dict:
+    """
+    Insert annotations from manifest_info into V2 or V3 manifest.
+    
+    Uses the canvases recorded by parse_manifest, the manifest is not parsed again.
+    Canvases were validated by parse_manifest and existing annotation lists are not read again,
+    they are replaced for canvases that get new annotations.
+    """
+    if manifest_info['manifest_version'] == 3:
+        return insert_annotations_v3(manifest_info, opts)
+
+    return insert_annotations_v2(manifest_info, opts)
+
+
+def index_annotations_by_canvas(manifest_info: dict) -> dict:
+    """
+    Return dict of lists of annotations in manifest_info by canvas id.
+    """
+    by_target = manifest_info['annotations']['by_target']
+    target_index = {cid: by_target[cid] for cid in manifest_info['canvas_ids'] if cid in by_target}
+    if len(target_index) < len(by_target):
+        logging.warning(f"Annotations on {len(by_target) - len(target_index)} targets not in manifest will be skipped.")
+
+    return target_index
+
+
+def insert_annotations_v2(manifest_info: dict, opts: dict) -> dict:
+    """
+    Insert annotations from manifest_info into IIIF V2 manifest.
+    
+    Writes AnnotationList files unless opts['reference_mode'] == 'inline'.
+    """
+    manif = manifest_info['manifest']
+    reference_mode = opts['reference_mode']
+    target_index = index_annotations_by_canvas(manifest_info)
+    annolist_idx = 0
+    if reference_mode == 'inline' and target_index:
+        logging.warning("Inline AnnotationLists are not allowed in the IIIF V2 presentation API!")
+
+    for canvas in manifest_info['canvases']:
+        canvas_id = canvas['@id']
+        annotations = target_index.get(canvas_id)
+        if annotations is None:
+            continue
         
+        annolist_idx += 1
+        annolist_id, annolist_fn = create_annotationlist_id(manifest_info, canvas_id, annolist_idx, opts)
+        if reference_mode == 'inline':
+            annolist = create_annotationlist_v2(manifest_info, annolist_id, annotations, add_context=False)
+            canvas['otherContent'] = [annolist]
+            
+        else:
+            annolist = create_annotationlist_v2(manifest_info, annolist_id, annotations, add_context=True)
+            save_json(annolist, annolist_fn, opts)
+            canvas['otherContent'] = [{
+                '@id': annolist_id,
+                '@type': 'sc:AnnotationList'
+            }]
+
+    manif['@id'] = manifest_info['id']
+    return manifest_info
+
+
+def insert_annotations_v3(manifest_info: dict, opts: dict) -> dict:
+    """
+    Insert annotations from manifest_info into IIIF V3 manifest.
+    
+    Writes AnnotationPage files unless opts['reference_mode'] == 'inline'.
+    """
+    manif = manifest_info['manifest']
+    reference_mode = opts['reference_mode']
+    target_index = index_annotations_by_canvas(manifest_info)
+    annolist_idx = 0
+
+    for canvas in manifest_info['canvases']:
+        canvas_id = canvas['id']
+        annotations = target_index.get(canvas_id)
+        if annotations is None:
+            continue
+        
+        annolist_idx += 1
+        annolist_id, annolist_fn = create_annotationlist_id(manifest_info, canvas_id, annolist_idx, opts)
+        if reference_mode == 'inline':
+            annolist = create_annotationlist_v3(manifest_info, annolist_id, annotations, add_context=False)
+            canvas['annotations'] = [annolist]
+            
+        else:
+            annolist = create_annotationlist_v3(manifest_info, annolist_id, annotations, add_context=True)
+            save_json(annolist, annolist_fn, opts)
+            canvas['annotations'] = [{
+                'id': annolist_id,
+                'type': 'AnnotationPage'
+            }]
+
+    manif['id'] = manifest_info['id']
     return manifest_info
 
 
@@ -530,23 +1158,16 @@ def create_annotationlist_id(manifest_info, canvas_id, annolist_idx, opts):
     """
     Return (uri, filename) for annotation list
     """
-    prefix = opts['url_prefix']
-    if not prefix:
-        # use manifest id as prefix
-        prefix = manifest_info['id']
-
-    scheme = opts['annolist_name_scheme']
-    if scheme == 'canvas':
+    # use manifest id as default prefix
+    prefix = opts['url_prefix'] or manifest_info['id']
+    if canvas_id and opts['annolist_name_scheme'] == 'canvas':
         # use last part of canvas id
-        canvas_part = canvas_id.split('/')[-1]
-        fn = canvas_part + '-annolist.json'
-        uri = prefix + '/' + fn
+        fn = canvas_id.rpartition('/')[2] + '-annolist.json'
     
     else:
         fn = f"annolist-{annolist_idx}.json"
-        uri = prefix + '/' + fn
         
-    return uri, fn
+    return f"{prefix}/{fn}", fn
 
 
 def create_manifest_id(manifest_info, opts):
@@ -571,17 +1192,16 @@ def action_check(args):
         sys.exit('ERROR: missing input_manifest parameter!')
         
     logging.info(f"Reading {args.input_manifest}")
-    with open_file_or_url(args.input_manifest) as file:
-        manif = json.load(file)
-        manifest_info = parse_manifest(manif, None, {'mode': 'read'})
-        annotation_info = manifest_info['annotations']
-        logging.info(f"IIIF V{manifest_info['manifest_version']} manifest {manifest_info['id']}")
-        logging.info(f"* label: '{manifest_info['label']}'")
-        logging.info(f"* {len(manifest_info['canvas_ids'])} canvases")
-        logging.info(f"* {len(annotation_info['annotations'])} annotations")
-        if len(annotation_info['annotations']) > 0:
-            logging.info(f"  * on {len(manifest_info['annotations']['by_target'])} canvases")
-            logging.info(f"  * motivations: {manifest_info['annotations']['motivations']}")
+    manifest_info = read_manifest(args.input_manifest, stream=args.stream)
+    annotation_info = manifest_info['annotations']
+    logging.info(f"IIIF V{manifest_info['manifest_version']} manifest {manifest_info['id']}")
+    logging.info(f"* label: '{manifest_info['label']}'")
+    logging.info(f"* {len(manifest_info['canvas_ids'])} canvases")
+    num_annos = len(annotation_info['annotations'])
+    logging.info(f"* {num_annos} annotations")
+    if num_annos > 0:
+        logging.info(f"  * on {len(annotation_info['by_target'])} canvases")
+        logging.info(f"  * motivations: {annotation_info['motivations']}")
 
 
 def action_extract(args):
@@ -595,11 +1215,9 @@ def action_extract(args):
         sys.exit('ERROR: missing output_file parameter!')
         
     logging.info(f"Reading manifest {args.input_manifest}")
-    with open_file_or_url(args.input_manifest) as file:
-        manif = json.load(file)
-        manifest_info = parse_manifest(manif, None, {'mode': 'read'})
-        num_annos = len(manifest_info['annotations']['annotations'])
-        logging.info(f"IIIF V{manifest_info['manifest_version']} manifest {manifest_info['id']} contains {num_annos} annotations.")
+    manifest_info = read_manifest(args.input_manifest, stream=args.stream)
+    num_annos = len(manifest_info['annotations']['annotations'])
+    logging.info(f"IIIF V{manifest_info['manifest_version']} manifest {manifest_info['id']} contains {num_annos} annotations.")
 
     opts = vars(args)
     annos = manifest_info['annotations']['annotations']
@@ -607,11 +1225,14 @@ def action_extract(args):
     if manifest_info['manifest_version'] == 2:
         logging.info(f"Writing IIIF V2 annotation list {args.output_file}")
         annolist = create_annotationlist_v2(manifest_info, annolist_id, annos, add_context=True)
+        items_key = 'resources'
     else:
         logging.info(f"Writing IIIF V3 annotation page {args.output_file}")
         annolist = create_annotationlist_v3(manifest_info, annolist_id, annos, add_context=True)
+        items_key = 'items'
         
-    save_json(annolist, args.output_file, opts)
+    # write annotations one by one instead of serializing the whole list at once
+    save_json_items(annolist, items_key, args.output_file, opts)
 
 
 def action_insert(args):
@@ -629,28 +1250,32 @@ def action_insert(args):
         
     logging.info(f"Reading manifest {args.input_manifest}")
     with open_file_or_url(args.input_manifest) as file:
-        manif = json.load(file)
-        manifest_info = parse_manifest(manif, None, {'mode': 'read'})
+        manif = load_json(file, args.input_manifest)
+        manifest_info = parse_manifest(manif, None)
         num_annos = len(manifest_info['annotations']['annotations'])
         logging.info(f"IIIF V{manifest_info['manifest_version']} manifest {manifest_info['id']} contains {num_annos} annotations.")
 
     logging.info(f"Reading annotation file {args.input_file}")
     with open_file_or_url(args.input_file) as file:
-        annos = json.load(file)
-        if manifest_info['manifest_version'] == 2:
+        if args.stream and can_stream_file(args.input_file):
+            logging.debug("Parsing annotation file incrementally")
+            annotation_info = stream_annotationlist(file, manifest_info['manifest_version'])
+
+        elif manifest_info['manifest_version'] == 2:
+            annos = load_json(file, args.input_file)
             annotation_info = parse_annotationlist_v2(annos, None) 
         
         else:
+            annos = load_json(file, args.input_file)
             annotation_info = parse_annotationlist_v3(annos, None) 
 
     opts = vars(args)
-    opts['mode'] = 'insert'
     manifest_id, manifest_file = create_manifest_id(manifest_info, opts)
     manifest_info['id'] = manifest_id
     manifest_info['annotations'] = annotation_info
     logging.info(f"Creating new manifest {manifest_id}")
-    # re-parse manifest, adding annotations and writing annotationlists
-    manifest_info = parse_manifest(manif, manifest_info, opts)
+    # add annotations to recorded canvases and write annotationlists
+    manifest_info = insert_annotations(manifest_info, opts)
     # save manifest
     save_json(manifest_info['manifest'], manifest_file, opts)
 
@@ -684,23 +1309,41 @@ def main():
     argp.add_argument('--annolist-name-scheme', dest='annolist_name_scheme',
                       choices=['canvas', 'sequence'], default='sequence', 
                       help='Naming scheme for generated AnnotationPage/List files.')
+    argp.add_argument('--no-cache', dest='no_cache', action='store_true',
+                      help='Do not use the on-disk cache for external AnnotationPage/List URLs in '
+                      + HTTP_CACHE_DIR + ' (files expire after one hour).')
 
+    argp.add_argument('--stream', dest='stream', action='store_true',
+                      help='Parse local manifest and annotation files incrementally with ijson. '
+                      + 'Uses less memory but is slower.')
     argp.add_argument('-l', '--log', dest='loglevel', choices=['INFO', 'DEBUG', 'ERROR'], default='INFO', 
                       help='Log level.')
     args = argp.parse_args()
     
     # set up 
     logging.basicConfig(level=args.loglevel)
+    if args.stream and ijson is None:
+        logging.warning("ijson is not installed, --stream is ignored.")
+
+    if args.no_cache:
+        global http_cache_dir
+        http_cache_dir = None
 
     # actions
-    if args.action == 'check':
-        action_check(args)
-        
-    elif args.action == 'extract':
-        action_extract(args)
+    try:
+        if args.action == 'check':
+            action_check(args)
+            
+        elif args.action == 'extract':
+            action_extract(args)
+
+        elif args.action == 'insert':
+            action_insert(args)
 
-    elif args.action == 'insert':
-        action_insert(args)
+    except ValueError as e:
+        # invalid manifest or annotations (includes JSON errors while streaming)
+        logging.debug("Error details:", exc_info=True)
+        sys.exit(f"ERROR: {e}")
 
 
 if __name__ == '__main__':
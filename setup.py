@@ -0,0 +1,22 @@
+import setuptools
+
+try:
+    # compile with mypyc if available
+    from mypyc.build import mypycify
+    ext_modules = mypycify(['iiifanno.py'])
+except ImportError:
+    ext_modules = []
+
+setuptools.setup(
+    name='iiifanno',
+    version='1.0',
+    description='Manipulate annotations in IIIF manifests.',
+    url='https://github.com/robcast/python-iiif-annotation-tool',
+    license='Apache-2.0',
+    python_requires='>=3.7',
+    py_modules=['iiifanno'],
+    ext_modules=ext_modules,
+    entry_points={
+        'console_scripts': ['iiifanno.py=iiifanno:main'],
+    },
+)